@@ -1,20 +1,56 @@
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from typing import List, Optional, Union
+import os
 import time
 import re
-from collections import defaultdict
 
 from data.db import SpaceDB
-from fastapi import FastAPI, HTTPException, Header, Query, Request
+from data.ranked_results import RankedResults
+from data.search_index import init_worker_index, worker_search
+from executors import BoundedExecutor, ExecutorSaturated
+from fastapi import FastAPI, HTTPException, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from models import NasaImage, SearchHistoryItem, Source, PaginatedHistoryResponse, PaginatedSourcesResponse, SearchRequest, SearchResponse
+from fastapi.responses import JSONResponse
+from models import NasaImage, SearchHistoryItem, Source, PaginatedHistoryResponse, PaginatedHistorySummaryResponse, HistoryDetailResponse, PaginatedSourcesResponse, SearchRequest, SearchResponse
 from pydantic import BaseModel, ValidationError
+from rate_limiter import RateLimit, create_rate_limiter, parse_rate_limit
+from validation import contains_sql_pattern, sanitize_input
 
-app = FastAPI()
 
-# Rate limiting storage (in production, use Redis or similar)
-request_counts = defaultdict(list)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    search_executor.shutdown()
+    history_executor.shutdown()
+    db.close()
+    rate_limiter.close()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Worker processes, as passed to uvicorn/gunicorn through WEB_CONCURRENCY. With more than one,
+# history and rate limits default to SQLite so every worker shares the same state.
+WORKERS = int(os.environ.get("WEB_CONCURRENCY", "1"))
+SHARED_STATE_BACKEND = "sqlite" if WORKERS > 1 else None
+
+# Rate limiting: token buckets per (route, client IP), in process memory or shared through SQLite
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", SHARED_STATE_BACKEND or "memory")
 RATE_LIMIT_REQUESTS = 100  # requests per minute
 RATE_LIMIT_WINDOW = 60  # seconds
+RATE_LIMIT_MAX_CLIENTS = int(os.environ.get("RATE_LIMIT_MAX_CLIENTS", "10000"))
+RATE_LIMIT_ROUTES = ("search", "history", "history_detail", "history_delete", "history_clear")
+
+# Per-route limits can be overridden as RATE_LIMIT_<ROUTE>="<requests>/<seconds>", e.g. RATE_LIMIT_SEARCH="300/60"
+rate_limiter = create_rate_limiter(
+    RATE_LIMIT_BACKEND,
+    default_limit=RateLimit(RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW),
+    route_limits={
+        route: parse_rate_limit(os.environ[f"RATE_LIMIT_{route.upper()}"])
+        for route in RATE_LIMIT_ROUTES
+        if os.environ.get(f"RATE_LIMIT_{route.upper()}")
+    },
+    max_clients=RATE_LIMIT_MAX_CLIENTS,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,45 +60,78 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-db = SpaceDB()
+# History backend: "json" (default, snapshot + journal) or "sqlite"
+HISTORY_BACKEND = os.environ.get("HISTORY_BACKEND", SHARED_STATE_BACKEND or "json")
+if WORKERS > 1 and HISTORY_BACKEND == "json":
+    raise RuntimeError("HISTORY_BACKEND=json cannot be shared between workers; use HISTORY_BACKEND=sqlite")
+if WORKERS > 1 and RATE_LIMIT_BACKEND == "memory":
+    print(f"Warning: RATE_LIMIT_BACKEND=memory with {WORKERS} workers allows up to {WORKERS}x the configured rate")
+db = SpaceDB(history_backend=HISTORY_BACKEND)
 
+# Search scoring is CPU-bound, so it runs on its own pool: "thread" (default) or "process"
+# to score outside the GIL. History reads and writes go to a separate I/O pool so slow
+# disk never holds up scoring. Calls beyond a pool's queue depth get a 503 instead of waiting.
+SEARCH_EXECUTOR = os.environ.get("SEARCH_EXECUTOR", "thread")
+SEARCH_WORKERS = int(os.environ.get("SEARCH_WORKERS", str(os.cpu_count() or 1)))
+SEARCH_QUEUE_DEPTH = int(os.environ.get("SEARCH_QUEUE_DEPTH", "64"))
+HISTORY_IO_WORKERS = int(os.environ.get("HISTORY_IO_WORKERS", "4"))
+HISTORY_IO_QUEUE_DEPTH = int(os.environ.get("HISTORY_IO_QUEUE_DEPTH", "256"))
 
-def check_rate_limit(client_ip: str):
-    """Check if client has exceeded rate limit."""
-    current_time = time.time()
-    client_requests = request_counts[client_ip]
-    
-    # Remove old requests outside the window
-    client_requests[:] = [req_time for req_time in client_requests 
-                         if current_time - req_time < RATE_LIMIT_WINDOW]
-    
-    # Check if limit exceeded
-    if len(client_requests) >= RATE_LIMIT_REQUESTS:
+search_executor = BoundedExecutor(
+    "search",
+    kind=SEARCH_EXECUTOR,
+    max_workers=SEARCH_WORKERS,
+    max_queue=SEARCH_QUEUE_DEPTH,
+    # Process workers each build their own copy of the index
+    **({"initializer": init_worker_index, "initargs": (db.get_index_documents(),)} if SEARCH_EXECUTOR == "process" else {})
+)
+history_executor = BoundedExecutor("history", max_workers=HISTORY_IO_WORKERS, max_queue=HISTORY_IO_QUEUE_DEPTH)
+
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"}
+    )
+
+
+async def rank_query(query: str) -> RankedResults:
+    """Rank query on the search executor, or straight from the result cache."""
+    ranked = db.get_cached_search(query)
+    if ranked is not None:
+        return ranked
+    if search_executor.kind == "process":
+        ranked_ids, confidence_scores = await search_executor.run(worker_search, query)
+        return db.cache_search(query, ranked_ids, confidence_scores)
+    return await search_executor.run(db.search, query)
+
+
+def check_rate_limit(request: Request, response: Response, route: str):
+    """Check if client has exceeded the rate limit for route, and add rate limit headers."""
+    decision = rate_limiter.check(request.client.host, route)
+    if not decision.allowed:
+        limit = rate_limiter.limit_for(route)
         raise HTTPException(
             status_code=429, 
-            detail=f"Rate limit exceeded. Max {RATE_LIMIT_REQUESTS} requests per minute."
+            detail=f"Rate limit exceeded. Max {limit.requests} requests per {limit.window:g} seconds.",
+            headers=decision.headers()
         )
-    
-    # Add current request
-    client_requests.append(current_time)
+    response.headers.update(decision.headers())
 
 
-def sanitize_input(text: str) -> str:
-    """Additional input sanitization."""
-    if not text:
-        return ""
-    
-    # Remove null bytes and control characters
-    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
-    
-    # Limit length
-    text = text[:1000]
-    
-    return text.strip()
+SEARCH_ID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$')
+
+
+def check_search_id(search_id: str):
+    """Validate search_id format (UUID)."""
+    if not SEARCH_ID_PATTERN.match(search_id.lower()):
+        raise HTTPException(status_code=400, detail="Invalid search ID format")
 
 
 @app.get("/api/sources", response_model=PaginatedSourcesResponse)
-def get_sources(
+async def get_sources(
     page: int = Query(1, ge=1, description="Page number (starts from 1)"),
     limit: int = Query(20, ge=1, le=100, description="Number of items per page (max 100)")
 ):
@@ -71,44 +140,88 @@ def get_sources(
     return paginated_result
 
 
-@app.get("/api/history", response_model=PaginatedHistoryResponse)
-def get_search_history(
+@app.get("/api/history", response_model=Union[PaginatedHistoryResponse, PaginatedHistorySummaryResponse])
+async def get_search_history(
     request: Request,
+    response: Response,
     page: int = Query(1, ge=1, le=10000, description="Page number (starts from 1, max 10000)"),
     page_size: int = Query(100, ge=1, le=100, description="Number of items per page (max 100)"),
+    cursor: Optional[str] = Query(None, max_length=100, description="next_cursor from a previous page; replaces page for keyset pagination"),
+    summary: bool = Query(False, description="Return only id, query, timestamp and resultCount per item (see /api/history/{search_id} for results)"),
     authorization: Optional[str] = Header(None)
 ):
     """
     Get paginated search history for the current user.
     
+    Pass the next_cursor of a page as cursor to get the following page in
+    constant time regardless of depth.
+    
     In the future, this will be filtered by user ID extracted from JWT token.
     For now, returns all search history since authentication is not yet implemented.
     """
     # Rate limiting
-    client_ip = request.client.host
-    check_rate_limit(client_ip)
+    check_rate_limit(request, response, "history")
     
     # TODO: Extract user_id from JWT token when authentication is implemented
     # Example: user_id = extract_user_from_jwt(authorization)
     user_id = None  # Placeholder for future authentication
     
     try:
-        paginated_history = db.get_search_history_paginated(user_id, page, page_size)
+        paginated_history = await history_executor.run(db.get_search_history_paginated, user_id, page, page_size, cursor, summary)
         return paginated_history
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid history cursor")
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         # Log the error in production
         raise HTTPException(status_code=500, detail="Failed to retrieve search history")
 
 
+@app.get("/api/history/{search_id}", response_model=HistoryDetailResponse)
+async def get_search_history_item(
+    search_id: str,
+    request: Request,
+    response: Response,
+    page: int = Query(1, ge=1, description="Page number of the stored results (starts from 1)"),
+    page_size: int = Query(20, ge=1, le=100, description="Number of results per page (max 100)"),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Get one search history item with a page of its stored results.
+    
+    In the future, this will validate that the user owns this search history item.
+    """
+    # Rate limiting
+    check_rate_limit(request, response, "history_detail")
+    
+    # Validate search_id format (UUID)
+    check_search_id(search_id)
+    
+    # TODO: Extract user_id from JWT token and validate ownership
+    user_id = None  # Placeholder for future authentication
+    
+    try:
+        history_item = await history_executor.run(db.get_search_history_item, search_id, user_id, page, page_size)
+    except ExecutorSaturated:
+        raise
+    except Exception as e:
+        # Log the error in production
+        raise HTTPException(status_code=500, detail="Failed to retrieve search history item")
+    
+    if history_item is None:
+        raise HTTPException(status_code=404, detail="Search history item not found")
+    return history_item
+
+
 @app.post("/api/search", response_model=SearchResponse)
-def search_images(search_request: SearchRequest, request: Request, authorization: Optional[str] = Header(None)):
+async def search_images(search_request: SearchRequest, request: Request, response: Response, authorization: Optional[str] = Header(None)):
     """
     Search through NASA images using natural language query with pagination.
     Automatically saves search to history only for first page (page=1).
     """
     # Rate limiting
-    client_ip = request.client.host
-    check_rate_limit(client_ip)
+    check_rate_limit(request, response, "search")
     
     # Additional sanitization (Pydantic validation already applied)
     query = sanitize_input(search_request.query)
@@ -124,23 +237,18 @@ def search_images(search_request: SearchRequest, request: Request, authorization
         raise HTTPException(status_code=400, detail="Query too long (max 500 characters)")
     
     # Check for SQL injection patterns (even though we're not using SQL)
-    sql_patterns = [
-        r'\b(union|select|insert|update|delete|drop|create|alter|exec|execute)\b',
-        r'--',
-        r'/\*.*?\*/',
-        r'\b(or|and)\s+\d+\s*=\s*\d+',
-    ]
-    
-    for pattern in sql_patterns:
-        if re.search(pattern, query.lower()):
-            raise HTTPException(status_code=400, detail="Query contains potentially malicious patterns")
+    if contains_sql_pattern(query):
+        raise HTTPException(status_code=400, detail="Query contains potentially malicious patterns")
     
     try:
-        # Perform search with pagination
-        results, confidence_scores, has_more, total_count = db.search_sources(query, page, page_size)
+        # Rank all matches once; the page and the history record both come from this result
+        ranked = await rank_query(query)
+        total_count = ranked.total_count
+        page_ids, has_more = ranked.page_ids(page, page_size)
         
         # Convert results to NasaImage format
-        nasa_images = [NasaImage(**result) for result in results]
+        nasa_images = [NasaImage(**result) for result in db.get_sources_by_ids(page_ids)]
+        confidence_scores = ranked.confidence_scores
         
         # Save to search history only for first page and if not explicitly skipped
         search_id = None
@@ -149,13 +257,11 @@ def search_images(search_request: SearchRequest, request: Request, authorization
             user_id = None  # Placeholder for future authentication
             
             # For history, we want to save ALL matching results, not just the first page
-            # Get all results for history (without pagination)
-            all_results, all_confidence_scores, _, _ = db.search_sources(query, page=1, page_size=total_count)
-            
-            search_id = db.add_search_history_item(
+            search_id = await history_executor.run(
+                db.add_search_history_item,
                 query=query,
-                results=all_results,  # Save ALL matching results for history
-                confidence_scores=all_confidence_scores,
+                result_ids=ranked.ranked_ids,  # Save ALL matching results for history (as id references)
+                confidence_scores=confidence_scores,
                 total_count=total_count
             )
         
@@ -174,36 +280,36 @@ def search_images(search_request: SearchRequest, request: Request, authorization
     
     except ValidationError as e:
         raise HTTPException(status_code=400, detail=f"Validation error: {e}")
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         # Log the error in production
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @app.delete("/api/history/{search_id}")
-def delete_search_history_item(search_id: str, request: Request, authorization: Optional[str] = Header(None)):
+async def delete_search_history_item(search_id: str, request: Request, response: Response, authorization: Optional[str] = Header(None)):
     """
     Delete a specific search history item.
     
     In the future, this will validate that the user owns this search history item.
     """
     # Rate limiting
-    client_ip = request.client.host
-    check_rate_limit(client_ip)
+    check_rate_limit(request, response, "history_delete")
     
     # Validate search_id format (UUID)
-    if not re.match(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', search_id.lower()):
-        raise HTTPException(status_code=400, detail="Invalid search ID format")
+    check_search_id(search_id)
     
     # TODO: Extract user_id from JWT token and validate ownership
     user_id = None  # Placeholder for future authentication
     
     try:
-        success = db.delete_search_history_item(search_id, user_id)
+        success = await history_executor.run(db.delete_search_history_item, search_id, user_id)
         if not success:
             raise HTTPException(status_code=404, detail="Search history item not found")
         
         return {"message": "Search history item deleted successfully"}
-    except HTTPException:
+    except (HTTPException, ExecutorSaturated):
         raise
     except Exception as e:
         # Log the error in production
@@ -211,26 +317,25 @@ def delete_search_history_item(search_id: str, request: Request, authorization:
 
 
 @app.delete("/api/history")
-def clear_all_search_history(request: Request, authorization: Optional[str] = Header(None)):
+async def clear_all_search_history(request: Request, response: Response, authorization: Optional[str] = Header(None)):
     """
     Clear all search history items for the current user.
     
     In the future, this will validate user authentication and only clear their items.
     """
     # Rate limiting
-    client_ip = request.client.host
-    check_rate_limit(client_ip)
+    check_rate_limit(request, response, "history_clear")
     
     # TODO: Extract user_id from JWT token when authentication is implemented
     user_id = None  # Placeholder for future authentication
     
     try:
-        success = db.clear_all_search_history(user_id)
+        success = await history_executor.run(db.clear_all_search_history, user_id)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to clear search history")
         
         return {"message": "All search history cleared successfully"}
-    except HTTPException:
+    except (HTTPException, ExecutorSaturated):
         raise
     except Exception as e:
         # Log the error in production
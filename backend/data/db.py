@@ -2,11 +2,16 @@ import json
 import os
 import time
 import uuid
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+from data.history_store import HistoryStore, create_history_store
+from data.ranked_results import RankedResults
+from data.result_cache import ResultCache
+from data.search_index import SearchIndex
 
 
 class SpaceDB:
-    def __init__(self):
+    def __init__(self, history_file_path: str = None, history_backend: str = "json"):
         # Load and parse the JSON data
         data_path = os.path.join(os.path.dirname(__file__), "mock_data.json")
         with open(data_path, "r", encoding="utf-8") as f:
@@ -34,29 +39,23 @@ class SpaceDB:
                 }
             )
         self._next_id = len(self._sources) + 1
+        self._sources_by_id: Dict[int, Dict] = {source["id"]: source for source in self._sources}
+
+        # Build the inverted index once so searches only touch matching postings
+        self._index = SearchIndex()
+        for source in self._sources:
+            self._index.add_document(source["id"], SearchIndex.searchable_text(source))
+
+        # Ranked results per query, so later pages slice instead of re-scoring
+        self._corpus_version = 0
+        self._result_cache = ResultCache()
         
-        # Initialize search history storage with JSON file persistence
-        self._history_file_path = os.path.join(os.path.dirname(__file__), "search_history.json")
-        self._search_history: List[Dict] = self._load_search_history()
+        # Initialize search history storage (JSON snapshot + journal by default, or SQLite)
+        self._history_store: HistoryStore = create_history_store(history_backend, history_file_path)
 
-    def _load_search_history(self) -> List[Dict]:
-        """Load search history from JSON file."""
-        try:
-            if os.path.exists(self._history_file_path):
-                with open(self._history_file_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            return []
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"Warning: Could not load search history: {e}")
-            return []
-
-    def _save_search_history(self):
-        """Save search history to JSON file."""
-        try:
-            with open(self._history_file_path, "w", encoding="utf-8") as f:
-                json.dump(self._search_history, f, indent=2, ensure_ascii=False)
-        except IOError as e:
-            print(f"Warning: Could not save search history: {e}")
+    def close(self):
+        """Flush pending history and release the history backend."""
+        self._history_store.close()
 
     def get_all_sources(self) -> List[Dict]:
         """Get all space sources."""
@@ -83,55 +82,138 @@ class SpaceDB:
             "returned_count": len(items)
         }
 
-    def add_search_history_item(self, query: str, results: List[Dict], confidence_scores: Dict[int, float] = None, total_count: int = None) -> str:
-        """Add a new search history item and return its ID."""
+    def add_search_history_item(self, query: str, results: List[Dict] = None, confidence_scores: Dict[int, float] = None,
+                                total_count: int = None, result_ids: List[int] = None, user_id: str = None) -> str:
+        """
+        Add a new search history item and return its ID.
+        
+        Only the ordered result ids and their scores are stored; pass either the
+        result dicts or their ids. Sources are looked up again when history is read.
+        """
         search_id = str(uuid.uuid4())
         timestamp = int(time.time() * 1000)  # Unix timestamp in milliseconds
         
+        if result_ids is None:
+            result_ids = [result["id"] for result in results or []]
+        confidence_scores = confidence_scores or {}
+        
         # Use total_count if provided, otherwise fall back to length of results
-        result_count = total_count if total_count is not None else len(results)
+        result_count = total_count if total_count is not None else len(result_ids)
         
         history_item = {
             "id": search_id,
             "query": query,
             "timestamp": timestamp,
             "resultCount": result_count,  # Use total count, not just current page
-            "results": results,
-            "confidence_scores": confidence_scores or {}
+            "result_ids": list(result_ids),
+            "scores": [confidence_scores.get(source_id, 0) for source_id in result_ids]
         }
         
-        # Add to beginning of list to keep most recent first
-        self._search_history.insert(0, history_item)
-        
-        # Save to JSON file
-        self._save_search_history()
+        self._history_store.add(history_item, user_id)
         
         return search_id
 
+    def _hydrate_history_item(self, item: Dict) -> Dict:
+        """Resolve a stored history item's result ids back into sources."""
+        results = []
+        confidence_scores = {}
+        for source_id, score in zip(item["result_ids"], item["scores"]):
+            source = self._sources_by_id.get(source_id)
+            if source is not None:
+                results.append(source)
+                confidence_scores[source_id] = score
+        return {
+            "id": item["id"],
+            "query": item["query"],
+            "timestamp": item["timestamp"],
+            "resultCount": item["resultCount"],
+            "results": results,
+            "confidence_scores": confidence_scores
+        }
+
+    @staticmethod
+    def _summarize_history_item(item: Dict) -> Dict:
+        """Get the list view of a history item, without its results."""
+        return {
+            "id": item["id"],
+            "query": item["query"],
+            "timestamp": item["timestamp"],
+            "resultCount": item["resultCount"]
+        }
+
+    def get_search_history_item(self, search_id: str, user_id: str = None, page: int = 1, page_size: int = 20) -> Optional[Dict]:
+        """Get one history item with a page of its stored results, or None if it does not exist."""
+        item = self._history_store.get(search_id, user_id)
+        if item is None:
+            return None
+        
+        start_index = (page - 1) * page_size
+        end_index = start_index + page_size
+        page_item = dict(item, result_ids=item["result_ids"][start_index:end_index], scores=item["scores"][start_index:end_index])
+        detail = self._hydrate_history_item(page_item)
+        detail.update({
+            "page": page,
+            "pageSize": page_size,
+            "has_more": end_index < len(item["result_ids"])
+        })
+        return detail
+
     def get_search_history(self, user_id: str = None) -> List[Dict]:
         """Get search history. In the future, filter by user_id when authentication is implemented."""
         # For now, return all search history since we don't have user authentication yet
         # TODO: Filter by user_id when JWT authentication is implemented
-        return self._search_history
+        items = self._history_store.get_page(user_id, 0, self._history_store.count(user_id))
+        return [self._hydrate_history_item(item) for item in items]
+
+    @staticmethod
+    def encode_history_cursor(item: Dict) -> str:
+        """Build the keyset cursor (timestamp + id) pointing just past a history item."""
+        return f"{item['timestamp']}:{item['id']}"
+
+    @staticmethod
+    def decode_history_cursor(cursor: str) -> Tuple[int, str]:
+        """Parse a history cursor. Raises ValueError if it is malformed."""
+        timestamp, separator, search_id = cursor.partition(":")
+        if not separator or not search_id:
+            raise ValueError("Invalid history cursor")
+        return int(timestamp), search_id
 
-    def get_search_history_paginated(self, user_id: str = None, page: int = 1, page_size: int = 100) -> Dict:
-        """Get paginated search history. In the future, filter by user_id when authentication is implemented."""
+    def get_search_history_paginated(self, user_id: str = None, page: int = 1, page_size: int = 100, cursor: str = None,
+                                     summary: bool = False) -> Dict:
+        """
+        Get paginated search history. In the future, filter by user_id when authentication is implemented.
+        
+        With a cursor (the next_cursor of a previous page) items are read by keyset
+        instead of offset, so deep pages cost the same as the first one. With
+        summary=True items carry only id, query, timestamp and resultCount.
+        """
         # For now, return all search history since we don't have user authentication yet
         # TODO: Filter by user_id when JWT authentication is implemented
         
         # Calculate pagination
-        total_items = len(self._search_history)
+        total_items = self._history_store.count(user_id)
         total_pages = (total_items + page_size - 1) // page_size  # Ceiling division
         
-        # Calculate offset
-        offset = (page - 1) * page_size
-        
-        # Get paginated items
-        items = self._search_history[offset:offset + page_size]
+        if cursor is not None:
+            # Fetch one extra item to learn whether another page follows
+            stored_items = self._history_store.get_page_after(user_id, self.decode_history_cursor(cursor), page_size + 1)
+            has_next = len(stored_items) > page_size
+            has_previous = True
+            stored_items = stored_items[:page_size]
+        else:
+            # Calculate offset
+            offset = (page - 1) * page_size
+            stored_items = self._history_store.get_page(user_id, offset, page_size)
+            
+            # Calculate pagination flags
+            has_next = page < total_pages
+            has_previous = page > 1
         
-        # Calculate pagination flags
-        has_next = page < total_pages
-        has_previous = page > 1
+        # Resolve result ids only for this page, and only when results are wanted
+        if summary:
+            items = [self._summarize_history_item(item) for item in stored_items]
+        else:
+            items = [self._hydrate_history_item(item) for item in stored_items]
         
         return {
             "items": items,
@@ -140,34 +222,73 @@ class SpaceDB:
             "total_items": total_items,
             "total_pages": total_pages,
             "has_next": has_next,
-            "has_previous": has_previous
+            "has_previous": has_previous,
+            "next_cursor": self.encode_history_cursor(stored_items[-1]) if has_next and stored_items else None
         }
 
     def delete_search_history_item(self, search_id: str, user_id: str = None) -> bool:
         """Delete a specific search history item. Returns True if deleted, False if not found."""
         # TODO: Validate user ownership when JWT authentication is implemented
-        for i, item in enumerate(self._search_history):
-            if item["id"] == search_id:
-                del self._search_history[i]
-                # Save to JSON file
-                self._save_search_history()
-                return True
-        return False
+        return self._history_store.delete(search_id, user_id)
 
     def clear_all_search_history(self, user_id: str = None) -> bool:
         """Clear all search history items. Returns True if successful."""
         # TODO: Filter by user_id when JWT authentication is implemented
         try:
-            self._search_history.clear()
-            self._save_search_history()
+            self._history_store.clear(user_id)
             return True
         except Exception as e:
             print(f"Error clearing search history: {e}")
             return False
 
+    def _on_corpus_changed(self):
+        """Invalidate everything derived from the corpus. Call after any change to the sources."""
+        self._corpus_version += 1
+        self._result_cache.invalidate()
+
+    def get_search_cache_stats(self) -> Dict:
+        """Get hit/miss counters and usage of the ranked result cache."""
+        return self._result_cache.stats()
+
+    def search(self, query: str) -> RankedResults:
+        """
+        Rank every source matching query in a single scoring pass.
+
+        The result serves any page (via RankedResults.page_ids) as well as the
+        history record, and is cached per lowercased query.
+        """
+        if not query.strip():
+            return RankedResults([], {})
+        
+        cached = self.get_cached_search(query)
+        if cached is not None:
+            return cached
+        
+        ranked_ids, confidence_scores = self._index.search(query)
+        return self.cache_search(query, ranked_ids, confidence_scores)
+
+    def get_cached_search(self, query: str) -> Optional[RankedResults]:
+        """Get the cached ranking for query, or None if it has to be scored."""
+        # Scoring only depends on the lowercased query, so that is the cache key
+        cached = self._result_cache.get((self._corpus_version, query.lower()))
+        return RankedResults(*cached) if cached is not None else None
+
+    def cache_search(self, query: str, ranked_ids: List[int], confidence_scores: Dict[int, float]) -> RankedResults:
+        """Cache a ranking scored outside search() (e.g. in a worker process) and return it."""
+        self._result_cache.put((self._corpus_version, query.lower()), ranked_ids, confidence_scores)
+        return RankedResults(ranked_ids, confidence_scores)
+
+    def get_index_documents(self) -> List[Tuple[int, str]]:
+        """Get the (source id, searchable text) pairs the index is built from, e.g. to index in another process."""
+        return [(source["id"], SearchIndex.searchable_text(source)) for source in self._sources]
+
+    def get_sources_by_ids(self, source_ids: List[int]) -> List[Dict]:
+        """Get sources in the given order."""
+        return [self._sources_by_id[source_id] for source_id in source_ids]
+
     def search_sources(self, query: str, page: int = 1, page_size: int = 20) -> tuple[List[Dict], Dict[int, float], bool, int]:
         """
-        Search through sources using basic keyword matching with pagination.
+        Search through sources using keyword matching over the inverted index with pagination.
         Returns (results, confidence_scores, has_more, total_count) where:
         - results: paginated list of matching sources
         - confidence_scores: maps source id to confidence for all results (not just current page)
@@ -176,50 +297,6 @@ class SpaceDB:
         
         This is a simple implementation - in a real app you'd use proper search/ML algorithms.
         """
-        if not query.strip():
-            return [], {}, False, 0
-        
-        query_lower = query.lower()
-        all_results = []
-        confidence_scores = {}
-        
-        for source in self._sources:
-            # Simple scoring based on keyword matches in name and description
-            score = 0
-            searchable_text = f"{source['name']} {source['description']}".lower()
-            
-            # Count keyword matches (basic implementation)
-            query_words = query_lower.split()
-            total_words = len(query_words)
-            matches = 0
-            
-            for word in query_words:
-                if word in searchable_text:
-                    matches += 1
-            
-            if matches > 0:
-                # Calculate confidence as percentage of query words found
-                score = (matches / total_words) * 100
-                
-                # Boost score if query appears as complete phrase
-                if query_lower in searchable_text:
-                    score = min(100, score * 1.5)
-                
-                all_results.append(source)
-                confidence_scores[source['id']] = round(score, 2)
-        
-        # Sort all results by confidence score (highest first)
-        all_results.sort(key=lambda x: confidence_scores.get(x['id'], 0), reverse=True)
-        
-        # Apply pagination
-        start_index = (page - 1) * page_size
-        end_index = start_index + page_size
-        paginated_results = all_results[start_index:end_index]
-        
-        # Determine if there are more pages
-        has_more = end_index < len(all_results)
-        
-        # Total count of all matching results
-        total_count = len(all_results)
-        
-        return paginated_results, confidence_scores, has_more, total_count
+        ranked = self.search(query)
+        page_ids, has_more = ranked.page_ids(page, page_size)
+        return self.get_sources_by_ids(page_ids), ranked.confidence_scores, has_more, ranked.total_count
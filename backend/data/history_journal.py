@@ -0,0 +1,236 @@
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process guard
+    fcntl = None
+
+# Compact after this many journal records, or at least this often when dirty
+DEFAULT_COMPACT_THRESHOLD = 1000
+DEFAULT_COMPACT_INTERVAL = 60.0  # seconds
+
+
+class HistoryJournal:
+    """
+    Append-only persistence for search history.
+
+    Every mutation is appended as one JSON Lines record ({"op": "add" | "delete"
+    | "clear", ...}) to the journal, so a write costs O(record) instead of
+    O(history). The full history lives in a snapshot file (a JSON list, newest
+    first, the same format search_history.json always had), and startup loads
+    the snapshot and replays the journal on top of it.
+
+    A background thread periodically compacts the journal into a new snapshot.
+    Snapshots are written to a temp file and renamed into place, and replay
+    skips a torn trailing record, so a crash mid-write cannot corrupt history.
+
+    Callers must hold `lock` while they mutate the in-memory history and append
+    the matching record, so compaction always sees the two in agreement.
+
+    Only one process may own a journal: load() takes a lock on a .lock file
+    next to the snapshot and fails if another process (e.g. a second uvicorn
+    worker) holds it, since both would overwrite each other's snapshots.
+    """
+
+    def __init__(self, snapshot_path: str, journal_path: Optional[str] = None,
+                 compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+                 compact_interval: float = DEFAULT_COMPACT_INTERVAL,
+                 fsync: bool = False):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or os.path.splitext(snapshot_path)[0] + ".jsonl"
+        self.compact_threshold = compact_threshold
+        self.compact_interval = compact_interval
+        self.fsync = fsync
+        self.lock = threading.RLock()
+        self._journal_file = None
+        self._pending_records = 0
+        self._state_provider: Optional[Callable[[], List[Dict]]] = None
+        self._compact_lock = threading.Lock()
+        self._compact_requested = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._owner_lock_file = None
+
+    @property
+    def _rotated_journal_path(self) -> str:
+        return self.journal_path + ".compacting"
+
+    def load(self) -> List[Dict]:
+        """Load the snapshot and replay journaled mutations. Returns history newest first."""
+        self._acquire_owner_lock()
+        snapshot = self._read_snapshot()
+        # Dict insertion order is chronological, which makes replay O(records)
+        entries: Dict[str, Dict] = {}
+        for item in reversed(snapshot):
+            entries[item["id"]] = item
+
+        # A leftover rotated journal means a compaction did not finish; replay is idempotent
+        replayed = 0
+        for path in (self._rotated_journal_path, self.journal_path):
+            replayed += self._replay(path, entries)
+
+        self._pending_records = replayed
+        return list(reversed(entries.values()))
+
+    def _acquire_owner_lock(self):
+        if fcntl is None or self._owner_lock_file is not None:
+            return
+        lock_file = open(self.snapshot_path + ".lock", "a")
+        try:
+            # POSIX record locks are per process, so reopening in the same process still works
+            fcntl.lockf(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise RuntimeError(
+                f"Search history {self.snapshot_path} is in use by another process; "
+                "use HISTORY_BACKEND=sqlite to share history between workers"
+            )
+        self._owner_lock_file = lock_file
+
+    def _read_snapshot(self) -> List[Dict]:
+        try:
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Warning: Could not load search history snapshot: {e}")
+        return []
+
+    @staticmethod
+    def _replay(path: str, entries: Dict[str, Dict]) -> int:
+        if not os.path.exists(path):
+            return 0
+        replayed = 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn write from a crash; the record never completed
+                        continue
+                    op = record.get("op")
+                    if op == "add":
+                        item = record["item"]
+                        entries.setdefault(item["id"], item)
+                    elif op == "delete":
+                        entries.pop(record["id"], None)
+                    elif op == "clear":
+                        entries.clear()
+                    replayed += 1
+        except IOError as e:
+            print(f"Warning: Could not replay search history journal: {e}")
+        return replayed
+
+    def start(self, state_provider: Callable[[], List[Dict]]):
+        """Start background compaction. state_provider returns the current history, newest first."""
+        self._state_provider = state_provider
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._compaction_loop, name="history-compaction", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Stop background compaction, compact one last time and close the journal."""
+        self._stopped.set()
+        self._compact_requested.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._pending_records:
+            self.compact()
+        with self.lock:
+            if self._journal_file is not None:
+                self._journal_file.close()
+                self._journal_file = None
+        if self._owner_lock_file is not None:
+            self._owner_lock_file.close()
+            self._owner_lock_file = None
+
+    def append_add(self, item: Dict):
+        self._append({"op": "add", "item": item})
+
+    def append_delete(self, search_id: str):
+        self._append({"op": "delete", "id": search_id})
+
+    def append_clear(self):
+        self._append({"op": "clear"})
+
+    def _append(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        try:
+            with self.lock:
+                journal = self._open_journal()
+                journal.write(line)
+                journal.flush()
+                if self.fsync:
+                    os.fsync(journal.fileno())
+                self._pending_records += 1
+                if self._pending_records >= self.compact_threshold:
+                    self._compact_requested.set()
+        except IOError as e:
+            print(f"Warning: Could not save search history: {e}")
+
+    def _open_journal(self):
+        if self._journal_file is None:
+            # Terminate a torn trailing record so the next one starts on its own line
+            needs_newline = False
+            if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) > 0:
+                with open(self.journal_path, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b"\n"
+            self._journal_file = open(self.journal_path, "a", encoding="utf-8")
+            if needs_newline:
+                self._journal_file.write("\n")
+        return self._journal_file
+
+    def _compaction_loop(self):
+        while not self._stopped.is_set():
+            self._compact_requested.wait(self.compact_interval)
+            self._compact_requested.clear()
+            if self._stopped.is_set():
+                break
+            if self._pending_records:
+                self.compact()
+
+    def compact(self):
+        """Write the current history to a new snapshot and truncate the journal."""
+        if self._state_provider is None:
+            return
+        with self._compact_lock:
+            try:
+                with self.lock:
+                    history = list(self._state_provider())
+                    # Rotate the journal so new appends go to a fresh file while the snapshot is written
+                    if self._journal_file is not None:
+                        self._journal_file.close()
+                        self._journal_file = None
+                    self._rotate_journal()
+                    self._pending_records = 0
+
+                self._write_snapshot(history)
+                if os.path.exists(self._rotated_journal_path):
+                    os.remove(self._rotated_journal_path)
+            except (IOError, OSError) as e:
+                print(f"Warning: Could not compact search history: {e}")
+
+    def _rotate_journal(self):
+        if not os.path.exists(self.journal_path):
+            return
+        if not os.path.exists(self._rotated_journal_path):
+            os.replace(self.journal_path, self._rotated_journal_path)
+            return
+        # An earlier compaction failed before its snapshot landed; keep its records too
+        with open(self.journal_path, "rb") as src, open(self._rotated_journal_path, "ab") as dst:
+            dst.write(src.read())
+        os.remove(self.journal_path)
+
+    def _write_snapshot(self, history: List[Dict]):
+        temp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(history, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
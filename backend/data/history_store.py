@@ -0,0 +1,334 @@
+import bisect
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from data.history_journal import HistoryJournal
+
+
+def to_reference_item(item: Dict) -> Dict:
+    """Convert a history item that stores full result dicts to result id references."""
+    if "result_ids" in item:
+        return item
+    results = item.get("results") or []
+    # JSON turned the confidence score keys into strings
+    confidence_scores = {str(key): value for key, value in (item.get("confidence_scores") or {}).items()}
+    return {
+        "id": item["id"],
+        "query": item["query"],
+        "timestamp": item["timestamp"],
+        "resultCount": item.get("resultCount", len(results)),
+        "result_ids": [result["id"] for result in results],
+        "scores": [confidence_scores.get(str(result["id"]), 0) for result in results]
+    }
+
+
+class HistoryStore:
+    """
+    Storage backend interface for search history.
+
+    Items are stored in reference form: id, query, timestamp, resultCount,
+    result_ids and scores. Reads return them newest first.
+    """
+
+    def add(self, item: Dict, user_id: str = None):
+        raise NotImplementedError
+
+    def count(self, user_id: str = None) -> int:
+        raise NotImplementedError
+
+    def get(self, search_id: str, user_id: str = None) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def get_page(self, user_id: str = None, offset: int = 0, limit: int = 100) -> List[Dict]:
+        raise NotImplementedError
+
+    def get_page_after(self, user_id: str = None, cursor: Tuple[int, str] = None, limit: int = 100) -> List[Dict]:
+        """Keyset pagination: up to limit items older than the (timestamp, id) cursor."""
+        raise NotImplementedError
+
+    def delete(self, search_id: str, user_id: str = None) -> bool:
+        raise NotImplementedError
+
+    def clear(self, user_id: str = None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class _LiveCounter:
+    """
+    Fenwick tree over history slots holding 1 for live items and 0 for deleted ones.
+
+    Supports appending a slot, flipping one and finding the slot of the k-th
+    live item, all in O(log n), so offset pages stay cheap while deleted slots
+    wait for compaction.
+    """
+
+    def __init__(self):
+        self._tree = [0]
+
+    def __len__(self) -> int:
+        return len(self._tree) - 1
+
+    def _prefix(self, index: int) -> int:
+        total = 0
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def append(self, value: int):
+        index = len(self._tree)
+        # The new node covers (index - lowbit(index), index]
+        self._tree.append(value + self._prefix(index - 1) - self._prefix(index - (index & -index)))
+
+    def add(self, slot: int, delta: int):
+        index = slot + 1
+        while index < len(self._tree):
+            self._tree[index] += delta
+            index += index & -index
+
+    def find(self, rank: int) -> int:
+        """Return the slot of the rank-th (1-based) live item."""
+        index = 0
+        step = 1 << (len(self).bit_length())
+        while step:
+            next_index = index + step
+            if next_index < len(self._tree) and self._tree[next_index] < rank:
+                index = next_index
+                rank -= self._tree[next_index]
+            step >>= 1
+        return index
+
+
+class JsonHistoryStore(HistoryStore):
+    """
+    The default backend: history in memory, persisted as a JSON snapshot plus an
+    append-only journal (see HistoryJournal).
+
+    Items are kept oldest first in a slot list, so adding is an O(1) append.
+    An id -> slot dict makes delete O(1): the slot is emptied and the list is
+    compacted once empty slots outnumber live items.
+    """
+
+    def __init__(self, snapshot_path: str):
+        self._journal = HistoryJournal(snapshot_path)
+        history = self._journal.load()
+        items = [to_reference_item(item) for item in history]
+        self._reset(reversed(items))
+        self._journal.start(self._newest_first)
+        if any(item is not original for item, original in zip(items, history)):
+            # Rewrite the snapshot once so it no longer carries full result dicts
+            self._journal.compact()
+
+    def _reset(self, items_oldest_first):
+        self._slots: List[Optional[Dict]] = []
+        self._timestamps: List[int] = []
+        self._slot_by_id: Dict[str, int] = {}
+        self._live = _LiveCounter()
+        for item in items_oldest_first:
+            self._append(item)
+
+    def _append(self, item: Dict):
+        self._slot_by_id[item["id"]] = len(self._slots)
+        self._slots.append(item)
+        self._timestamps.append(item["timestamp"])
+        self._live.append(1)
+
+    def _newest_first(self) -> List[Dict]:
+        return [item for item in reversed(self._slots) if item is not None]
+
+    def add(self, item: Dict, user_id: str = None):
+        with self._journal.lock:
+            self._append(item)
+            self._journal.append_add(item)
+
+    def count(self, user_id: str = None) -> int:
+        return len(self._slot_by_id)
+
+    def get(self, search_id: str, user_id: str = None) -> Optional[Dict]:
+        with self._journal.lock:
+            slot = self._slot_by_id.get(search_id)
+            return self._slots[slot] if slot is not None else None
+
+    def _collect(self, slot: int, limit: int) -> List[Dict]:
+        """Collect up to limit live items walking from slot towards older ones."""
+        items = []
+        while slot >= 0 and len(items) < limit:
+            item = self._slots[slot]
+            if item is not None:
+                items.append(item)
+            slot -= 1
+        return items
+
+    def get_page(self, user_id: str = None, offset: int = 0, limit: int = 100) -> List[Dict]:
+        with self._journal.lock:
+            live = len(self._slot_by_id)
+            if offset >= live:
+                return []
+            # The offset-th newest item is the (live - offset)-th oldest live item
+            return self._collect(self._live.find(live - offset), limit)
+
+    def get_page_after(self, user_id: str = None, cursor: Tuple[int, str] = None, limit: int = 100) -> List[Dict]:
+        timestamp, search_id = cursor
+        with self._journal.lock:
+            slot = self._slot_by_id.get(search_id)
+            if slot is None:
+                # The cursor item is gone; continue with everything strictly older than it
+                slot = bisect.bisect_left(self._timestamps, timestamp)
+            return self._collect(slot - 1, limit)
+
+    def delete(self, search_id: str, user_id: str = None) -> bool:
+        with self._journal.lock:
+            slot = self._slot_by_id.pop(search_id, None)
+            if slot is None:
+                return False
+            self._slots[slot] = None
+            self._live.add(slot, -1)
+            self._journal.append_delete(search_id)
+            if len(self._slots) - len(self._slot_by_id) > max(len(self._slot_by_id), 64):
+                self._reset([item for item in self._slots if item is not None])
+            return True
+
+    def clear(self, user_id: str = None):
+        with self._journal.lock:
+            self._reset([])
+            self._journal.append_clear()
+
+    def close(self):
+        self._journal.close()
+
+
+class SqliteHistoryStore(HistoryStore):
+    """
+    History in a SQLite database (WAL mode), so it does not have to fit in RAM.
+
+    Pages are read through the (user_id, timestamp) index and deletes go
+    through the unique index on id. Per-user row counts are kept by triggers
+    so total_items does not need a scan.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS search_history (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL,
+            user_id TEXT,
+            query TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            result_count INTEGER NOT NULL,
+            result_ids TEXT NOT NULL,
+            scores TEXT NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_search_history_id ON search_history (id);
+        CREATE INDEX IF NOT EXISTS idx_search_history_user_timestamp ON search_history (user_id, timestamp);
+        CREATE TABLE IF NOT EXISTS search_history_counts (
+            user_key TEXT PRIMARY KEY,
+            item_count INTEGER NOT NULL
+        );
+        CREATE TRIGGER IF NOT EXISTS trg_search_history_insert AFTER INSERT ON search_history BEGIN
+            INSERT OR IGNORE INTO search_history_counts (user_key, item_count) VALUES (COALESCE(NEW.user_id, ''), 0);
+            UPDATE search_history_counts SET item_count = item_count + 1 WHERE user_key = COALESCE(NEW.user_id, '');
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_search_history_delete AFTER DELETE ON search_history BEGIN
+            UPDATE search_history_counts SET item_count = item_count - 1 WHERE user_key = COALESCE(OLD.user_id, '');
+        END;
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._conn.executescript(self._SCHEMA)
+
+    @staticmethod
+    def _row_to_item(row: sqlite3.Row) -> Dict:
+        return {
+            "id": row["id"],
+            "query": row["query"],
+            "timestamp": row["timestamp"],
+            "resultCount": row["result_count"],
+            "result_ids": json.loads(row["result_ids"]),
+            "scores": json.loads(row["scores"])
+        }
+
+    def add(self, item: Dict, user_id: str = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO search_history (id, user_id, query, timestamp, result_count, result_ids, scores) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (item["id"], user_id, item["query"], item["timestamp"], item["resultCount"],
+                 json.dumps(item["result_ids"], separators=(",", ":")),
+                 json.dumps(item["scores"], separators=(",", ":"))),
+            )
+
+    def count(self, user_id: str = None) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT item_count FROM search_history_counts WHERE user_key = ?", (user_id or "",)
+            ).fetchone()
+        return row["item_count"] if row else 0
+
+    def get(self, search_id: str, user_id: str = None) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, query, timestamp, result_count, result_ids, scores FROM search_history WHERE id = ?",
+                (search_id,),
+            ).fetchone()
+        return self._row_to_item(row) if row else None
+
+    def get_page(self, user_id: str = None, offset: int = 0, limit: int = 100) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, query, timestamp, result_count, result_ids, scores FROM search_history "
+                "WHERE user_id IS ? ORDER BY timestamp DESC, seq DESC LIMIT ? OFFSET ?",
+                (user_id, limit, offset),
+            ).fetchall()
+        return [self._row_to_item(row) for row in rows]
+
+    def get_page_after(self, user_id: str = None, cursor: Tuple[int, str] = None, limit: int = 100) -> List[Dict]:
+        timestamp, search_id = cursor
+        with self._lock:
+            row = self._conn.execute("SELECT seq FROM search_history WHERE id = ?", (search_id,)).fetchone()
+            # Without the cursor row, continue with everything strictly older than it
+            seq = row["seq"] if row else 0
+            rows = self._conn.execute(
+                "SELECT id, query, timestamp, result_count, result_ids, scores FROM search_history "
+                "WHERE user_id IS ? AND (timestamp < ? OR (timestamp = ? AND seq < ?)) "
+                "ORDER BY timestamp DESC, seq DESC LIMIT ?",
+                (user_id, timestamp, timestamp, seq, limit),
+            ).fetchall()
+        return [self._row_to_item(row) for row in rows]
+
+    def delete(self, search_id: str, user_id: str = None) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM search_history WHERE id = ?", (search_id,))
+        return cursor.rowcount > 0
+
+    def clear(self, user_id: str = None):
+        with self._lock:
+            self._conn.execute("DELETE FROM search_history WHERE user_id IS ?", (user_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+HISTORY_BACKENDS = ("json", "sqlite")
+
+
+def create_history_store(backend: str = "json", path: Optional[str] = None) -> HistoryStore:
+    """Create the history backend by name. path defaults to a file next to this module."""
+    data_dir = os.path.dirname(__file__)
+    if backend == "json":
+        return JsonHistoryStore(path or os.path.join(data_dir, "search_history.json"))
+    if backend == "sqlite":
+        return SqliteHistoryStore(path or os.path.join(data_dir, "search_history.db"))
+    raise ValueError(f"Unknown history backend: {backend} (expected one of {', '.join(HISTORY_BACKENDS)})")
@@ -0,0 +1,28 @@
+from typing import Dict, List, Tuple
+
+
+class RankedResults:
+    """
+    The full ranked outcome of one search.
+
+    Holds every matching source id in rank order together with the confidence
+    map, so a single scoring pass can serve both the requested page and the
+    history record. The underlying list and dict may be shared with the result
+    cache and must not be mutated.
+    """
+
+    __slots__ = ("ranked_ids", "confidence_scores")
+
+    def __init__(self, ranked_ids: List[int], confidence_scores: Dict[int, float]):
+        self.ranked_ids = ranked_ids
+        self.confidence_scores = confidence_scores
+
+    @property
+    def total_count(self) -> int:
+        return len(self.ranked_ids)
+
+    def page_ids(self, page: int = 1, page_size: int = 20) -> Tuple[List[int], bool]:
+        """Get the ids on a page and whether more pages follow it."""
+        start_index = (page - 1) * page_size
+        end_index = start_index + page_size
+        return self.ranked_ids[start_index:end_index], end_index < len(self.ranked_ids)
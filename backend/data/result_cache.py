@@ -0,0 +1,108 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# Default cache limits
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+DEFAULT_TTL_SECONDS = 300
+
+# Approximate size of one int key plus one float score held by an entry
+_BYTES_PER_RESULT = 52
+
+
+class CachedResult:
+    """A ranked result set: ordered source ids plus the confidence for each id."""
+
+    __slots__ = ("ranked_ids", "confidence_scores", "size", "expires_at")
+
+    def __init__(self, ranked_ids: List[int], confidence_scores: Dict[int, float], size: int, expires_at: float):
+        self.ranked_ids = ranked_ids
+        self.confidence_scores = confidence_scores
+        self.size = size
+        self.expires_at = expires_at
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of ranked search results with TTL expiry.
+
+    Entries are evicted least recently used first once either max_entries or
+    max_bytes (an estimate of the memory held by the cached ids and scores) is
+    exceeded. Callers must not mutate the lists and dicts they get back.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, CachedResult]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def estimate_size(ranked_ids: List[int], confidence_scores: Dict[int, float]) -> int:
+        """Estimate the bytes held by a cached result set."""
+        return sys.getsizeof(ranked_ids) + sys.getsizeof(confidence_scores) + len(confidence_scores) * _BYTES_PER_RESULT
+
+    def get(self, key: Hashable) -> Optional[Tuple[List[int], Dict[int, float]]]:
+        """Return (ranked_ids, confidence_scores) for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.ranked_ids, entry.confidence_scores
+
+    def put(self, key: Hashable, ranked_ids: List[int], confidence_scores: Dict[int, float]):
+        """Cache a ranked result set, evicting older entries to stay within limits."""
+        size = self.estimate_size(ranked_ids, confidence_scores)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CachedResult(ranked_ids, confidence_scores, size, time.monotonic() + self.ttl_seconds)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def invalidate(self):
+        """Drop every cached result, e.g. after the corpus changed."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """Get cache counters and current usage."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
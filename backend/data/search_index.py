@@ -0,0 +1,192 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+# Vocabulary terms are indexed by every character n-gram up to this length so
+# that substring lookups only have to look at terms sharing the query's grams.
+MAX_GRAM_LENGTH = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split lowercased searchable text into positional terms.
+
+    Splitting on single spaces (instead of any whitespace) keeps empty terms for
+    repeated spaces, so phrase checks over positions behave exactly like a
+    substring check on the original text.
+    """
+    return text.split(" ")
+
+
+class SearchIndex:
+    """
+    Inverted index over source name + description.
+
+    Maps each term to its postings (source id -> term positions). Query words
+    match by substring, like the original linear scan, so words are first
+    expanded to the vocabulary terms containing them via an n-gram index over
+    the vocabulary, and only the postings of those terms are touched.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, List[int]]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._doc_lengths: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    @staticmethod
+    def searchable_text(source: Dict) -> str:
+        """Build the lowercased text a source is matched against."""
+        return f"{source['name']} {source['description']}".lower()
+
+    def add_document(self, doc_id: int, text: str):
+        """Index an already lowercased document text under doc_id."""
+        terms = tokenize(text)
+        for position, term in enumerate(terms):
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._add_term_grams(term)
+            postings.setdefault(doc_id, []).append(position)
+        self._doc_lengths[doc_id] = len(terms)
+
+    def _add_term_grams(self, term: str):
+        for gram in self._term_grams(term):
+            self._grams.setdefault(gram, set()).add(term)
+
+    @staticmethod
+    def _term_grams(term: str) -> Set[str]:
+        grams = set()
+        for size in range(1, MAX_GRAM_LENGTH + 1):
+            for start in range(len(term) - size + 1):
+                grams.add(term[start:start + size])
+        return grams
+
+    def expand(self, word: str) -> Set[str]:
+        """Return the vocabulary terms that contain word as a substring."""
+        if not word:
+            return set()
+        if len(word) <= MAX_GRAM_LENGTH:
+            return set(self._grams.get(word, ()))
+
+        gram_sets = []
+        for start in range(len(word) - MAX_GRAM_LENGTH + 1):
+            terms = self._grams.get(word[start:start + MAX_GRAM_LENGTH])
+            if not terms:
+                return set()
+            gram_sets.append(terms)
+        gram_sets.sort(key=len)
+        candidates = set(gram_sets[0]).intersection(*gram_sets[1:])
+        return {term for term in candidates if word in term}
+
+    def matching_documents(self, word: str) -> Set[int]:
+        """Return ids of documents whose text contains word."""
+        docs: Set[int] = set()
+        for term in self.expand(word):
+            docs.update(self._postings[term])
+        return docs
+
+    def _positions(self, terms: Iterable[str], doc_id: int) -> Set[int]:
+        positions: Set[int] = set()
+        for term in terms:
+            positions.update(self._postings.get(term, {}).get(doc_id, ()))
+        return positions
+
+    def _contains_phrase(self, doc_id: int, pieces: List[str],
+                         first_terms: Set[str], last_terms: Set[str]) -> bool:
+        """
+        Check that the space-separated pieces occur consecutively in doc_id.
+
+        The first piece may end a term and the last piece may start one; every
+        piece in between has to be a whole term.
+        """
+        last = len(pieces) - 1
+        middle = [(offset, pieces[offset]) for offset in range(1, last)]
+
+        # Anchor on the most selective constraint to get candidate start positions
+        if middle:
+            offset, piece = min(middle, key=lambda item: len(self._postings.get(item[1], {}).get(doc_id, ())))
+            starts = {p - offset for p in self._positions([piece], doc_id)}
+        elif pieces[0]:
+            starts = self._positions(first_terms, doc_id)
+        else:
+            starts = {p - last for p in self._positions(last_terms, doc_id)}
+
+        doc_length = self._doc_lengths.get(doc_id, 0)
+        first_positions = self._positions(first_terms, doc_id) if pieces[0] else None
+        last_positions = self._positions(last_terms, doc_id) if pieces[last] else None
+        middle_positions = {piece: self._positions([piece], doc_id) for _, piece in middle}
+
+        for start in starts:
+            if start < 0 or start + last >= doc_length:
+                continue
+            if first_positions is not None and start not in first_positions:
+                continue
+            if last_positions is not None and start + last not in last_positions:
+                continue
+            if all(start + offset in middle_positions[piece] for offset, piece in middle):
+                return True
+        return False
+
+    def search(self, query: str) -> Tuple[List[int], Dict[int, float]]:
+        """
+        Score documents against query using postings only.
+
+        Returns (ranked_ids, confidence_scores) with the same scoring as the
+        original scan: the percentage of query words found, boosted by 1.5 when
+        the whole query appears as a phrase, highest first and ties in id order.
+        """
+        query_lower = query.lower()
+        query_words = query_lower.split()
+        total_words = len(query_words)
+        if not total_words:
+            return [], {}
+
+        matches: Counter = Counter()
+        for word, occurrences in Counter(query_words).items():
+            for doc_id in self.matching_documents(word):
+                matches[doc_id] += occurrences
+
+        # A phrase match implies every query word matched, so only those documents are checked
+        pieces = query_lower.split(" ")
+        phrase_docs: Set[int] = set()
+        full_matches = [doc_id for doc_id, count in matches.items() if count == total_words]
+        if full_matches:
+            if len(pieces) == 1:
+                phrase_docs = self.matching_documents(query_lower) & set(full_matches)
+            else:
+                first_terms = {t for t in self.expand(pieces[0]) if t.endswith(pieces[0])}
+                last_terms = {t for t in self.expand(pieces[-1]) if t.startswith(pieces[-1])}
+                phrase_docs = {
+                    doc_id for doc_id in full_matches
+                    if self._contains_phrase(doc_id, pieces, first_terms, last_terms)
+                }
+
+        confidence_scores = {}
+        for doc_id in sorted(matches):
+            score = (matches[doc_id] / total_words) * 100
+            if doc_id in phrase_docs:
+                score = min(100, score * 1.5)
+            confidence_scores[doc_id] = round(score, 2)
+
+        ranked_ids = sorted(confidence_scores, key=lambda doc_id: confidence_scores[doc_id], reverse=True)
+        return ranked_ids, confidence_scores
+
+
+# Index owned by a search process pool worker (see init_worker_index)
+_worker_index: Optional[SearchIndex] = None
+
+
+def init_worker_index(documents: List[Tuple[int, str]]):
+    """Process pool initializer: build the worker's own index from (doc_id, text) pairs."""
+    global _worker_index
+    _worker_index = SearchIndex()
+    for doc_id, text in documents:
+        _worker_index.add_document(doc_id, text)
+
+
+def worker_search(query: str) -> Tuple[List[int], Dict[int, float]]:
+    """Run SearchIndex.search in a process pool worker."""
+    return _worker_index.search(query)
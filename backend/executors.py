@@ -0,0 +1,70 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+class ExecutorSaturated(Exception):
+    """Raised when an executor already has max_queue calls in flight."""
+
+    def __init__(self, name: str):
+        super().__init__(f"{name} executor is saturated")
+        self.name = name
+
+
+class BoundedExecutor:
+    """
+    A thread or process pool with a cap on calls in flight (queued plus running).
+
+    run() awaits the call without blocking the event loop. Once max_queue calls
+    are in flight it fails fast with ExecutorSaturated instead of queueing, so
+    overload turns into quick 503s rather than unbounded latency for everyone.
+    A slot is only released when the call actually finishes, even if the
+    awaiting request was cancelled in the meantime.
+    """
+
+    def __init__(self, name: str, kind: str = "thread", max_workers: Optional[int] = None, max_queue: int = 64,
+                 initializer: Optional[Callable] = None, initargs: Tuple = ()):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind: {kind} (expected one of {', '.join(EXECUTOR_KINDS)})")
+        if max_queue < 1:
+            raise ValueError(f"Invalid executor queue depth: {max_queue}")
+        self.name = name
+        self.kind = kind
+        self.max_queue = max_queue
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        if kind == "process":
+            self._executor: Executor = ProcessPoolExecutor(max_workers, initializer=initializer, initargs=initargs)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix=name,
+                                                initializer=initializer, initargs=initargs)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool. Raises ExecutorSaturated if max_queue calls are already in flight."""
+        with self._lock:
+            if self._in_flight >= self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(self.name)
+            self._in_flight += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional
 from pydantic import BaseModel, Field, validator
-import re
+
+from validation import validate_query_text
 
 
 class Source(BaseModel):
@@ -40,6 +41,37 @@ class PaginatedHistoryResponse(BaseModel):
     total_pages: int
     has_next: bool
     has_previous: bool
+    next_cursor: Optional[str] = None
+
+
+class HistorySummaryItem(BaseModel):
+    id: str
+    query: str
+    timestamp: int
+    resultCount: int
+
+
+class PaginatedHistorySummaryResponse(BaseModel):
+    items: List[HistorySummaryItem]
+    page: int
+    page_size: int
+    total_items: int
+    total_pages: int
+    has_next: bool
+    has_previous: bool
+    next_cursor: Optional[str] = None
+
+
+class HistoryDetailResponse(BaseModel):
+    id: str
+    query: str
+    timestamp: int
+    resultCount: int
+    results: List[NasaImage]
+    confidence_scores: Dict[int, float]
+    page: int
+    pageSize: int
+    has_more: bool
 
 
 class PaginatedSourcesResponse(BaseModel):
@@ -75,39 +107,8 @@ class SearchRequest(BaseModel):
     
     @validator('query')
     def validate_query(cls, v):
-        if not v or not v.strip():
-            raise ValueError('Query cannot be empty or only whitespace')
-        
-        # Remove potential script tags and dangerous characters
-        dangerous_patterns = [
-            r'<script[^>]*>.*?</script>',
-            r'javascript:',
-            r'vbscript:',
-            r'onload=',
-            r'onerror=',
-            r'onclick=',
-            r'eval\(',
-            r'exec\(',
-            r'__import__',
-            r'subprocess',
-            r'os\.system',
-            r'eval\s*\(',
-        ]
-        
-        query_lower = v.lower()
-        for pattern in dangerous_patterns:
-            if re.search(pattern, query_lower, re.IGNORECASE):
-                raise ValueError(f'Query contains potentially dangerous content: {pattern}')
-        
-        # Limit special characters
-        if len(re.findall(r'[<>{}[\]\\|`~]', v)) > 10:
-            raise ValueError('Query contains too many special characters')
-        
-        # Check for excessive repetition (potential DoS)
-        if re.search(r'(.)\1{50,}', v):
-            raise ValueError('Query contains excessive character repetition')
-            
-        return v.strip()
+        # Dangerous content, special character and repetition checks, compiled once in validation.py
+        return validate_query_text(v)
 
 
 class SearchResponse(BaseModel):
@@ -0,0 +1,211 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+# Default cap on tracked (route, client) buckets
+DEFAULT_MAX_CLIENTS = 10000
+
+
+class RateLimit(NamedTuple):
+    requests: int  # bucket capacity
+    window: float  # seconds to refill a full bucket
+
+
+def parse_rate_limit(value: str) -> RateLimit:
+    """Parse a "<requests>/<seconds>" rate limit, e.g. "100/60"."""
+    requests, _, window = value.partition("/")
+    limit = RateLimit(int(requests), float(window or 60))
+    if limit.requests < 1 or limit.window <= 0:
+        raise ValueError(f"Invalid rate limit: {value}")
+    return limit
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: int  # seconds until the bucket is full again
+    retry_after: int  # seconds until the request would be allowed (0 if allowed)
+
+    def headers(self) -> Dict[str, str]:
+        """Standard rate limit response headers for this decision."""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(self.reset_after),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+class TokenBucketRateLimiter:
+    """
+    Token bucket rate limiter with O(1) state per (route, client).
+
+    Each bucket is just (tokens, last refill time), refilled lazily on access.
+    Buckets live in an LRU-ordered dict capped at max_clients, so idle clients
+    are evicted first and scanning traffic cannot grow memory without bound.
+    An evicted client simply starts again with a full bucket.
+    """
+
+    def __init__(self, default_limit: RateLimit, route_limits: Optional[Dict[str, RateLimit]] = None,
+                 max_clients: int = DEFAULT_MAX_CLIENTS):
+        self.default_limit = default_limit
+        self.route_limits = dict(route_limits or {})
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[Tuple[str, str], list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def limit_for(self, route: str) -> RateLimit:
+        return self.route_limits.get(route, self.default_limit)
+
+    def close(self):
+        pass
+
+    def check(self, client: str, route: str = "default", cost: int = 1) -> RateLimitDecision:
+        """Take cost tokens from the client's bucket for route if it has enough."""
+        limit = self.limit_for(route)
+        rate = limit.requests / limit.window  # tokens per second
+        now = time.monotonic()
+        key = (route, client)
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [float(limit.requests), now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(limit.requests, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+
+            allowed = bucket[0] >= cost
+            if allowed:
+                bucket[0] -= cost
+            tokens = bucket[0]
+
+        return self._decision(limit, tokens, allowed, cost)
+
+    @staticmethod
+    def _decision(limit: RateLimit, tokens: float, allowed: bool, cost: int) -> RateLimitDecision:
+        rate = limit.requests / limit.window
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=limit.requests,
+            remaining=int(tokens),
+            reset_after=math.ceil((limit.requests - tokens) / rate),
+            retry_after=0 if allowed else math.ceil((cost - tokens) / rate),
+        )
+
+
+class SqliteRateLimiter(TokenBucketRateLimiter):
+    """
+    The same token buckets kept in a SQLite database, so that several worker
+    processes share one limit per client instead of each granting the full rate.
+
+    Each check is one BEGIN IMMEDIATE transaction (read, refill, take, write),
+    which serializes concurrent checks across processes. Buckets use wall clock
+    time since monotonic clocks are not comparable between processes. A bucket
+    idle for a full window has refilled and is the same as a missing one, so
+    those rows are pruned periodically, followed by the least recently seen if
+    more than max_clients remain.
+    """
+
+    PRUNE_EVERY = 1000  # checks between prunes
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+            route TEXT NOT NULL,
+            client TEXT NOT NULL,
+            tokens REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (route, client)
+        );
+        CREATE INDEX IF NOT EXISTS idx_rate_limit_buckets_updated_at ON rate_limit_buckets (updated_at);
+    """
+
+    def __init__(self, db_path: str, default_limit: RateLimit, route_limits: Optional[Dict[str, RateLimit]] = None,
+                 max_clients: int = DEFAULT_MAX_CLIENTS):
+        super().__init__(default_limit, route_limits, max_clients)
+        self.db_path = db_path
+        self._checks = 0
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._conn.executescript(self._SCHEMA)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM rate_limit_buckets").fetchone()[0]
+
+    def check(self, client: str, route: str = "default", cost: int = 1) -> RateLimitDecision:
+        """Take cost tokens from the client's shared bucket for route if it has enough."""
+        limit = self.limit_for(route)
+        rate = limit.requests / limit.window
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at FROM rate_limit_buckets WHERE route = ? AND client = ?", (route, client)
+                ).fetchone()
+                if row is None:
+                    tokens = float(limit.requests)
+                else:
+                    tokens = min(limit.requests, row[0] + max(0.0, now - row[1]) * rate)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_limit_buckets (route, client, tokens, updated_at) VALUES (?, ?, ?, ?)",
+                    (route, client, tokens, now),
+                )
+                self._checks += 1
+                if self._checks % self.PRUNE_EVERY == 0:
+                    self._prune(now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return self._decision(limit, tokens, allowed, cost)
+
+    def _prune(self, now: float):
+        longest_window = max([self.default_limit.window] + [limit.window for limit in self.route_limits.values()])
+        self._conn.execute("DELETE FROM rate_limit_buckets WHERE updated_at <= ?", (now - longest_window,))
+        cursor = self._conn.execute(
+            "DELETE FROM rate_limit_buckets WHERE rowid IN ("
+            "SELECT rowid FROM rate_limit_buckets ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_clients,),
+        )
+        self.evictions += max(cursor.rowcount, 0)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+RATE_LIMIT_BACKENDS = ("memory", "sqlite")
+
+
+def create_rate_limiter(backend: str = "memory", path: Optional[str] = None, **kwargs) -> TokenBucketRateLimiter:
+    """Create the rate limiter by backend name. path defaults to data/rate_limits.db."""
+    if backend == "memory":
+        return TokenBucketRateLimiter(**kwargs)
+    if backend == "sqlite":
+        return SqliteRateLimiter(path or os.path.join(os.path.dirname(__file__), "data", "rate_limits.db"), **kwargs)
+    raise ValueError(f"Unknown rate limit backend: {backend} (expected one of {', '.join(RATE_LIMIT_BACKENDS)})")
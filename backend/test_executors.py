@@ -0,0 +1,31 @@
+import asyncio
+import threading
+
+from executors import BoundedExecutor, ExecutorSaturated
+
+# Test that calls beyond the queue depth are rejected instead of queued
+print("=== Testing bounded executor ===")
+executor = BoundedExecutor("test", max_workers=1, max_queue=2)
+release = threading.Event()
+
+
+async def main():
+    blocked = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    try:
+        await executor.run(sum, [1, 2])
+        saturated = False
+    except ExecutorSaturated:
+        saturated = True
+    print(f"Saturated at depth 2 - Expected: True, Got: {saturated}")
+    assert saturated and executor.rejected == 1
+
+    release.set()
+    await asyncio.gather(*blocked)
+    result = await executor.run(sum, [1, 2], start=3)
+    print(f"After draining - In flight: {executor.in_flight}, Result: {result}")
+    assert executor.in_flight == 0 and result == 6
+
+
+asyncio.run(main())
+executor.shutdown()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+
+from data.db import SpaceDB
+
+# Test that history survives restarts through the snapshot + journal
+history_dir = tempfile.mkdtemp()
+history_path = os.path.join(history_dir, "search_history.json")
+
+print("=== Testing journaled history persistence ===")
+db = SpaceDB(history_file_path=history_path)
+ksc_results, ksc_scores, _, ksc_total = db.search_sources('ksc', 1, 20)
+first_id = db.add_search_history_item(query='ksc', results=ksc_results, confidence_scores=ksc_scores, total_count=ksc_total)
+second_id = db.add_search_history_item(query='mars', results=[], total_count=0)
+third_id = db.add_search_history_item(query='moon', results=[], total_count=0)
+db.delete_search_history_item(second_id)
+
+# Simulate a crash in the middle of writing a journal record
+with open(db._history_store._journal.journal_path, "a", encoding="utf-8") as f:
+    f.write('{"op":"add","item":{"id":"torn"')
+
+reloaded = SpaceDB(history_file_path=history_path)
+reloaded_ids = [item["id"] for item in reloaded.get_search_history()]
+print(f"Journal replay - Expected: {[third_id, first_id]}, Got: {reloaded_ids}")
+assert reloaded_ids == [third_id, first_id]
+
+# Records appended after the torn one must still replay
+fourth_id = reloaded.add_search_history_item(query='sun', results=[], total_count=0)
+reloaded.close()
+
+compacted = SpaceDB(history_file_path=history_path)
+compacted_ids = [item["id"] for item in compacted.get_search_history()]
+print(f"After compaction - Expected: {[fourth_id, third_id, first_id]}, Got: {compacted_ids}")
+print(f"  Journal empty after compaction: {not os.path.exists(compacted._history_store._journal.journal_path)}")
+assert compacted_ids == [fourth_id, third_id, first_id]
+
+compacted.clear_all_search_history()
+compacted.close()
+print(f"After clear - Items: {len(SpaceDB(history_file_path=history_path).get_search_history())}")
+
+# A second process must not open the same JSON history (it would overwrite our snapshots)
+import multiprocessing
+
+
+def open_in_other_process(path):
+    try:
+        SpaceDB(history_file_path=path)
+        return "opened"
+    except RuntimeError:
+        return "refused"
+
+
+owner = SpaceDB(history_file_path=history_path)
+with multiprocessing.Pool(1) as pool:
+    other_process = pool.apply(open_in_other_process, (history_path,))
+print(f"Second process opening the same history - Expected: refused, Got: {other_process}")
+assert other_process == "refused"
+owner.close()
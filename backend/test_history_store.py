@@ -0,0 +1,60 @@
+import os
+import tempfile
+
+from data.db import SpaceDB
+
+# Test that every history backend behaves the same
+history_dir = tempfile.mkdtemp()
+
+for backend, file_name in [("json", "search_history.json"), ("sqlite", "search_history.db")]:
+    print(f"=== Testing {backend} history backend ===")
+    history_path = os.path.join(history_dir, file_name)
+    db = SpaceDB(history_file_path=history_path, history_backend=backend)
+
+    ids = []
+    for query in ["ksc", "mars", "moon", "apollo", "shuttle"]:
+        ranked = db.search(query)
+        ids.append(db.add_search_history_item(query=query, result_ids=ranked.ranked_ids,
+                                              confidence_scores=ranked.confidence_scores,
+                                              total_count=ranked.total_count))
+    db.delete_search_history_item(ids[1])
+    db.close()
+
+    reopened = SpaceDB(history_file_path=history_path, history_backend=backend)
+    page = reopened.get_search_history_paginated(page=2, page_size=2)
+    page_ids = [item["id"] for item in page["items"]]
+    print(f"Page 2 - Total: {page['total_items']}, Pages: {page['total_pages']}, Items: {[item['query'] for item in page['items']]}")
+    assert page["total_items"] == 4 and page_ids == [ids[2], ids[0]]
+
+    ksc = page["items"][1]
+    print(f"  Hydrated results for '{ksc['query']}': {len(ksc['results'])} of {ksc['resultCount']}")
+    assert len(ksc["results"]) == ksc["resultCount"]
+
+    # Walk all pages by cursor and compare with offset pages
+    for query in ["sun", "jupiter", "saturn", "venus", "comet"]:
+        reopened.add_search_history_item(query=query, result_ids=[], total_count=0)
+    offset_ids = [item["id"] for item in reopened.get_search_history()]
+    cursor_ids = []
+    cursor_page = reopened.get_search_history_paginated(page_size=3)
+    while True:
+        cursor_ids.extend(item["id"] for item in cursor_page["items"])
+        if not cursor_page["next_cursor"]:
+            break
+        cursor_page = reopened.get_search_history_paginated(page_size=3, cursor=cursor_page["next_cursor"])
+    print(f"  Cursor walk matches offset order: {cursor_ids == offset_ids} ({len(cursor_ids)} items)")
+    assert cursor_ids == offset_ids
+
+    # Summary pages leave out results; the detail view pages through them
+    summary = reopened.get_search_history_paginated(page_size=3, summary=True)
+    print(f"  Summary item keys: {sorted(summary['items'][0])}")
+    assert "results" not in summary["items"][0]
+    detail = reopened.get_search_history_item(ids[0], page=2, page_size=10)
+    print(f"  Detail page 2 of '{detail['query']}': {len(detail['results'])} results, has_more={detail['has_more']}")
+    assert [r["id"] for r in detail["results"]] == [r["id"] for r in ksc["results"][10:20]] and detail["has_more"]
+    assert reopened.get_search_history_item("missing") is None
+
+    print(f"  Delete missing id: {reopened.delete_search_history_item('missing')}")
+    reopened.clear_all_search_history()
+    print(f"  After clear: {reopened.get_search_history_paginated()['total_items']}")
+    assert reopened.get_search_history_paginated()["total_items"] == 0
+    reopened.close()
@@ -0,0 +1,47 @@
+import time
+
+from rate_limiter import RateLimit, TokenBucketRateLimiter
+
+# Test token bucket limits, refill and idle client eviction
+limiter = TokenBucketRateLimiter(default_limit=RateLimit(3, 0.3), route_limits={"search": RateLimit(1, 60)}, max_clients=2)
+
+print("=== Testing token bucket rate limiter ===")
+decisions = [limiter.check("10.0.0.1").allowed for _ in range(4)]
+print(f"Burst of 4 with capacity 3: {decisions}")
+assert decisions == [True, True, True, False]
+
+time.sleep(0.15)
+print(f"After half a window: {limiter.check('10.0.0.1').allowed}")
+
+blocked = [limiter.check("10.0.0.1", "search") for _ in range(2)][-1]
+print(f"Per-route limit - Allowed: {blocked.allowed}, Retry-After: {blocked.headers()['Retry-After']}")
+assert not blocked.allowed and blocked.retry_after > 0
+
+for client in ["10.0.0.2", "10.0.0.3", "10.0.0.4"]:
+    limiter.check(client)
+print(f"Tracked buckets capped at 2: {len(limiter)} (evicted {limiter.evictions})")
+assert len(limiter) == 2
+
+# Test that worker processes share one SQLite-backed limit instead of each getting the full rate
+import multiprocessing
+import os
+import tempfile
+
+from rate_limiter import SqliteRateLimiter
+
+rate_limit_db = os.path.join(tempfile.mkdtemp(), "rate_limits.db")
+
+
+def allowed_in_worker(checks):
+    worker_limiter = SqliteRateLimiter(rate_limit_db, default_limit=RateLimit(100, 3600))
+    allowed = sum(worker_limiter.check("10.0.0.9").allowed for _ in range(checks))
+    worker_limiter.close()
+    return allowed
+
+
+print("=== Testing shared SQLite rate limiter ===")
+SqliteRateLimiter(rate_limit_db, default_limit=RateLimit(100, 3600)).close()
+with multiprocessing.Pool(4) as pool:
+    allowed_per_worker = pool.map(allowed_in_worker, [60] * 4)
+print(f"4 workers x 60 checks, limit 100 - Allowed: {sum(allowed_per_worker)} {allowed_per_worker}")
+assert sum(allowed_per_worker) == 100
@@ -0,0 +1,36 @@
+from data.db import SpaceDB
+
+# Test that the inverted index scores exactly like a full substring scan
+db = SpaceDB()
+
+
+def scan_search(query: str):
+    """Reference implementation: score every source by substring matching."""
+    query_lower = query.lower()
+    query_words = query_lower.split()
+    scores = {}
+    for source in db.get_all_sources():
+        searchable_text = f"{source['name']} {source['description']}".lower()
+        matches = sum(1 for word in query_words if word in searchable_text)
+        if matches > 0:
+            score = (matches / len(query_words)) * 100
+            if query_lower in searchable_text:
+                score = min(100, score * 1.5)
+            scores[source['id']] = round(score, 2)
+    ranked = sorted(scores, key=lambda source_id: scores[source_id], reverse=True)
+    return ranked, scores
+
+
+queries = ["ksc", "Mars", "gale crater", "of the", "Space  shuttle", "launch pad 39", "x", "ter Cra", "Alien disco party on Mars"]
+
+print("=== Testing inverted index against a full scan ===")
+mismatches = 0
+for query in queries:
+    results, scores, _, total = db.search_sources(query, 1, 1000)
+    expected_ranked, expected_scores = scan_search(query)
+    same = [r['id'] for r in results] == expected_ranked and scores == expected_scores
+    print(f"Query '{query}' - Total: {total}, Matches scan: {same}")
+    if not same:
+        mismatches += 1
+
+assert mismatches == 0
@@ -0,0 +1,84 @@
+import random
+import re
+import timeit
+
+from validation import (DANGEROUS_PATTERNS, SQL_PATTERNS, contains_sql_pattern, sanitize_input,
+                        validate_query_text)
+
+
+# The per-request pattern loops the pipeline replaced, kept here as the reference
+def legacy_validate(v):
+    if not v or not v.strip():
+        raise ValueError('Query cannot be empty or only whitespace')
+    query_lower = v.lower()
+    for pattern in DANGEROUS_PATTERNS:
+        if re.search(pattern, query_lower, re.IGNORECASE):
+            raise ValueError(f'Query contains potentially dangerous content: {pattern}')
+    if len(re.findall(r'[<>{}[\]\\|`~]', v)) > 10:
+        raise ValueError('Query contains too many special characters')
+    if re.search(r'(.)\1{50,}', v):
+        raise ValueError('Query contains excessive character repetition')
+    return v.strip()
+
+
+def legacy_sanitize(text):
+    if not text:
+        return ""
+    return re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)[:1000].strip()
+
+
+def legacy_contains_sql(query):
+    return any(re.search(pattern, query.lower()) for pattern in SQL_PATTERNS)
+
+
+def outcome(validate, value):
+    try:
+        return ("ok", validate(value))
+    except ValueError as e:
+        return ("error", str(e))
+
+
+QUERIES = [
+    "Mars", "  ISS  ", "Apollo 11 moon landing", "", "   ", "hubble deep field",
+    "<script>alert(1)</script>", "<SCRIPT src=x>y</SCRIPT>", "JavaScript:void(0)", "x onerror=y",
+    "eval (1)", "EXEC(cmd)", "__import__('os')", "os.system", "subprocess",
+    "<>" * 5, "<>" * 5 + "|", "{}[]|`~\\<>{", "a" * 51, "a" * 52, "ab" * 60, "~" * 60,
+    "select * from sources", "mars -- comment", "/* x */ moon", "1 or 1=1", "x and 2 = 2",
+    "selection of images", "update\x00d", "tab\there", "café über", "line\nbreak" + "b" * 60,
+]
+
+rng = random.Random(7)
+alphabet = "ab <>{}[]|`~\\-/*=1 orand;:()eEsx\x00\t\n"
+QUERIES += ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 80))) for _ in range(3000)]
+
+print("=== Testing precompiled validation pipeline ===")
+mismatches = 0
+for query in QUERIES:
+    if outcome(legacy_validate, query) != outcome(validate_query_text, query):
+        mismatches += 1
+    if legacy_sanitize(query) != sanitize_input(query):
+        mismatches += 1
+    if legacy_contains_sql(query) != contains_sql_pattern(query):
+        mismatches += 1
+print(f"Checked {len(QUERIES)} queries - Mismatches: {mismatches}")
+assert mismatches == 0
+
+print(f"Script tag error: {outcome(validate_query_text, '<script>x</script>')[1]}")
+assert outcome(validate_query_text, "a" * 51)[1] == 'Query contains excessive character repetition'
+
+
+def run_legacy():
+    for query in QUERIES[:32]:
+        outcome(legacy_validate, query)
+        legacy_contains_sql(legacy_sanitize(query))
+
+
+def run_pipeline():
+    for query in QUERIES[:32]:
+        outcome(validate_query_text, query)
+        contains_sql_pattern(sanitize_input(query))
+
+
+legacy_time = min(timeit.repeat(run_legacy, number=200, repeat=3)) / (200 * 32)
+pipeline_time = min(timeit.repeat(run_pipeline, number=200, repeat=3)) / (200 * 32)
+print(f"Per request - Legacy: {legacy_time * 1e6:.1f}us, Pipeline: {pipeline_time * 1e6:.1f}us")
@@ -0,0 +1,98 @@
+"""
+Search request validation, compiled once at import.
+
+Each check used to loop over its raw pattern strings with re.search on every
+request. Every group of patterns is now joined into one compiled alternation,
+so a request costs one scan per stage:
+
+1. validate_query_text: dangerous content (one scan over the lowercased query)
+   plus special character count and character repetition (one scan)
+2. sanitize_input: control character removal (one scan)
+3. contains_sql_pattern: SQL injection patterns (one scan)
+
+Accept/reject behavior and error messages are unchanged. When a combined scan
+finds something, the individual patterns are tried in their original order
+only to report the same error as before.
+"""
+import re
+
+DANGEROUS_PATTERNS = [
+    r'<script[^>]*>.*?</script>',
+    r'javascript:',
+    r'vbscript:',
+    r'onload=',
+    r'onerror=',
+    r'onclick=',
+    r'eval\(',
+    r'exec\(',
+    r'__import__',
+    r'subprocess',
+    r'os\.system',
+    r'eval\s*\(',
+]
+
+SQL_PATTERNS = [
+    r'\b(union|select|insert|update|delete|drop|create|alter|exec|execute)\b',
+    r'--',
+    r'/\*.*?\*/',
+    r'\b(or|and)\s+\d+\s*=\s*\d+',
+]
+
+SPECIAL_CHARACTERS = r'[<>{}[\]\\|`~]'
+MAX_SPECIAL_CHARACTERS = 10
+MAX_REPEATED_CHARACTERS = 50
+
+_DANGEROUS_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in DANGEROUS_PATTERNS), re.IGNORECASE)
+_DANGEROUS_RES = [(pattern, re.compile(pattern, re.IGNORECASE)) for pattern in DANGEROUS_PATTERNS]
+
+# Either more than MAX_SPECIAL_CHARACTERS special characters anywhere (checked once from the
+# start of the string) or a character repeated more than MAX_REPEATED_CHARACTERS times
+_SPECIAL_CHARACTER_RE = re.compile(SPECIAL_CHARACTERS)
+_SHAPE_RE = re.compile(
+    rf'\A(?=(?:[^<>{{}}[\]\\|`~]*{SPECIAL_CHARACTERS}){{{MAX_SPECIAL_CHARACTERS + 1}}})'
+    rf'|(?P<repeated>.)(?P=repeated){{{MAX_REPEATED_CHARACTERS},}}'
+)
+
+_CONTROL_CHARACTERS_RE = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
+
+_SQL_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in SQL_PATTERNS))
+
+
+def validate_query_text(v: str) -> str:
+    """Validate a raw search query and return it stripped. Raises ValueError if it is rejected."""
+    if not v or not v.strip():
+        raise ValueError('Query cannot be empty or only whitespace')
+
+    # Remove potential script tags and dangerous characters
+    if _DANGEROUS_RE.search(v.lower()):
+        query_lower = v.lower()
+        for pattern, compiled in _DANGEROUS_RES:
+            if compiled.search(query_lower):
+                raise ValueError(f'Query contains potentially dangerous content: {pattern}')
+
+    # Limit special characters and check for excessive repetition (potential DoS)
+    if _SHAPE_RE.search(v):
+        if len(_SPECIAL_CHARACTER_RE.findall(v)) > MAX_SPECIAL_CHARACTERS:
+            raise ValueError('Query contains too many special characters')
+        raise ValueError('Query contains excessive character repetition')
+
+    return v.strip()
+
+
+def sanitize_input(text: str) -> str:
+    """Additional input sanitization."""
+    if not text:
+        return ""
+
+    # Remove null bytes and control characters
+    text = _CONTROL_CHARACTERS_RE.sub('', text)
+
+    # Limit length
+    text = text[:1000]
+
+    return text.strip()
+
+
+def contains_sql_pattern(query: str) -> bool:
+    """Check for SQL injection patterns (even though we're not using SQL)."""
+    return _SQL_RE.search(query.lower()) is not None
@@ -1,17 +1,21 @@
-import React from 'react';
+import React, { useEffect } from 'react';
 import { useParams } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
 import styled from 'styled-components';
 import { colors } from '../constants/colors';
 import { sizes } from '../constants/sizes';
-import { useAppSelector } from '../redux/store';
+import { useAppDispatch, useAppSelector } from '../redux/store';
 import {
-  selectHistoryItems,
-  selectHistoryLoading,
-  selectHistoryError
+  selectHistoryDetail,
+  selectHistoryDetailLoading,
+  selectHistoryDetailError
 } from '../redux/modules/history/selectors';
+import { loadHistoryDetailRequest } from '../redux/modules/history/reducer';
 import { NasaImagesList } from '../components/NasaImagesList';
-import { LoadingSpinner, ErrorMessage } from '../components/common';
+import { LoadingSpinner, ErrorMessage, Button } from '../components/common';
+
+// Number of stored results fetched per request
+const DETAIL_PAGE_SIZE = 100;
 
 const HistoryDetailContainer = styled.div`
   padding: ${sizes.padding.xl};
@@ -56,19 +60,38 @@ const ResultsSection = styled.div`
   margin-top: ${sizes.margin.xl};
 `;
 
+const LoadMoreWrapper = styled.div`
+  display: flex;
+  justify-content: center;
+  margin-top: ${sizes.margin.lg};
+`;
+
 export const HistoryDetailPage: React.FC = () => {
   const { historyId } = useParams<{ historyId: string }>();
   const { t } = useTranslation();
+  const dispatch = useAppDispatch();
   
-  const searchHistory = useAppSelector(selectHistoryItems);
-  const loading = useAppSelector(selectHistoryLoading);
-  const error = useAppSelector(selectHistoryError);
+  const detail = useAppSelector(selectHistoryDetail);
+  const loading = useAppSelector(selectHistoryDetailLoading);
+  const error = useAppSelector(selectHistoryDetailError);
+
+  // Load the history item with the first page of its results
+  useEffect(() => {
+    if (historyId) {
+      dispatch(loadHistoryDetailRequest({ historyId, page: 1, pageSize: DETAIL_PAGE_SIZE }));
+    }
+  }, [dispatch, historyId]);
+
+  const historyItem = detail && detail.id === historyId ? detail : undefined;
 
-  // Find the specific history item by ID
-  const historyItem = searchHistory.find(item => item.id === historyId);
+  const handleLoadMore = () => {
+    if (historyItem && historyId) {
+      dispatch(loadHistoryDetailRequest({ historyId, page: historyItem.page + 1, pageSize: DETAIL_PAGE_SIZE }));
+    }
+  };
 
-  // If we don't have the history item and not loading, it might not exist
-  if (!loading && !historyItem) {
+  // The item could not be loaded, most likely because it does not exist
+  if (!historyItem && error) {
     return (
       <HistoryDetailContainer>
         <ErrorMessage message={t('historyDetailPage.notFound', 'History item not found')} />
@@ -77,7 +100,7 @@ export const HistoryDetailPage: React.FC = () => {
   }
 
   // Show loading while fetching data
-  if (loading && !historyItem) {
+  if (!historyItem) {
     return (
       <HistoryDetailContainer>
         <LoadingSpinner message={t('common.loading')} />
@@ -85,7 +108,7 @@ export const HistoryDetailPage: React.FC = () => {
     );
   }
 
-  // Show error if there's an error
+  // Show error if loading more results failed
   if (error) {
     return (
       <HistoryDetailContainer>
@@ -94,11 +117,7 @@ export const HistoryDetailPage: React.FC = () => {
     );
   }
 
-  // If we have the history item, display it
-  if (!historyItem) {
-    return null;
-  }
-
+  // We have the history item, display it
   return (
     <HistoryDetailContainer>
       <HistoryRecord>
@@ -113,6 +132,13 @@ export const HistoryDetailPage: React.FC = () => {
           <ResultsSection>
             <h3>{t('historyDetailPage.searchResults', 'Search Results')} ({historyItem.resultCount})</h3>
             <NasaImagesList nasaImages={historyItem.results} />
+            {historyItem.has_more && (
+              <LoadMoreWrapper>
+                <Button onClick={handleLoadMore} disabled={loading}>
+                  {t('mainPage.loadMore')}
+                </Button>
+              </LoadMoreWrapper>
+            )}
           </ResultsSection>
         )}
       </HistoryRecord>
@@ -1,5 +1,5 @@
 import { createSlice, PayloadAction } from '@reduxjs/toolkit';
-import { SearchHistoryItem, PaginatedHistoryResponse } from '../../../types';
+import { SearchHistoryItem, PaginatedHistoryResponse, HistoryDetailResponse } from '../../../types';
 
 // State interface
 export interface HistoryState {
@@ -14,6 +14,11 @@ export interface HistoryState {
     hasNext: boolean;
     hasPrevious: boolean;
   };
+  detail: {
+    item: HistoryDetailResponse | null;
+    loading: boolean;
+    error: string | null;
+  };
 }
 
 // Initial state
@@ -29,6 +34,11 @@ const initialState: HistoryState = {
     hasNext: false,
     hasPrevious: false,
   },
+  detail: {
+    item: null,
+    loading: false,
+    error: null,
+  },
 };
 
 // Redux slice
@@ -107,6 +117,34 @@ const historySlice = createSlice({
       state.error = action.payload;
     },
 
+    // Load a single history item with a page of its results
+    loadHistoryDetailRequest: (state, action: PayloadAction<{ historyId: string; page?: number; pageSize?: number }>) => {
+      state.detail.loading = true;
+      state.detail.error = null;
+      if ((action.payload.page ?? 1) === 1) {
+        state.detail.item = null;
+      }
+    },
+    loadHistoryDetailSuccess: (state, action: PayloadAction<HistoryDetailResponse>) => {
+      state.detail.loading = false;
+      const current = state.detail.item;
+      if (action.payload.page > 1 && current && current.id === action.payload.id) {
+        // Append the next page of results
+        state.detail.item = {
+          ...action.payload,
+          results: [...current.results, ...action.payload.results],
+          confidence_scores: { ...current.confidence_scores, ...action.payload.confidence_scores },
+        };
+      } else {
+        state.detail.item = action.payload;
+      }
+      state.detail.error = null;
+    },
+    loadHistoryDetailFailure: (state, action: PayloadAction<string>) => {
+      state.detail.loading = false;
+      state.detail.error = action.payload;
+    },
+
     // Local operations (for optimistic updates)
     setHistoryItems: (state, action: PayloadAction<SearchHistoryItem[]>) => {
       state.searchHistory = action.payload;
@@ -128,6 +166,9 @@ export const {
   loadHistoryRequest,
   loadHistorySuccess,
   loadHistoryFailure,
+  loadHistoryDetailRequest,
+  loadHistoryDetailSuccess,
+  loadHistoryDetailFailure,
   setHistoryItems,
 } = historySlice.actions;
 
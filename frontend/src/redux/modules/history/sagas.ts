@@ -1,7 +1,7 @@
-import { call, put, takeEvery, fork } from 'redux-saga/effects';
+import { call, put, takeEvery, takeLatest, fork } from 'redux-saga/effects';
 import { PayloadAction } from '@reduxjs/toolkit';
 import axios from 'axios';
-import { SearchHistoryItem, PaginatedHistoryResponse } from '../../../types';
+import { SearchHistoryItem, PaginatedHistoryResponse, HistoryDetailResponse } from '../../../types';
 import {
   addSearchToHistoryRequest,
   addSearchToHistorySuccess,
@@ -15,6 +15,9 @@ import {
   loadHistoryRequest,
   loadHistorySuccess,
   loadHistoryFailure,
+  loadHistoryDetailRequest,
+  loadHistoryDetailSuccess,
+  loadHistoryDetailFailure,
 } from './reducer';
 
 // Local storage key
@@ -26,7 +29,8 @@ const API_BASE_URL = 'http://localhost:5000';
 // API helper functions
 async function loadHistoryFromAPI(page: number = 1, pageSize: number = 100): Promise<PaginatedHistoryResponse> {
   try {
-    const response = await axios.get(`${API_BASE_URL}/api/history?page=${page}&page_size=${pageSize}`);
+    // Summary mode: the list only needs id, query, timestamp and resultCount
+    const response = await axios.get(`${API_BASE_URL}/api/history?page=${page}&page_size=${pageSize}&summary=true`);
     return response.data;
   } catch (error) {
     console.error('Failed to load history from API:', error);
@@ -34,6 +38,16 @@ async function loadHistoryFromAPI(page: number = 1, pageSize: number = 100): Pro
   }
 }
 
+async function loadHistoryDetailFromAPI(historyId: string, page: number = 1, pageSize: number = 100): Promise<HistoryDetailResponse> {
+  try {
+    const response = await axios.get(`${API_BASE_URL}/api/history/${historyId}?page=${page}&page_size=${pageSize}`);
+    return response.data;
+  } catch (error) {
+    console.error('Failed to load history item from API:', error);
+    throw error;
+  }
+}
+
 async function deleteHistoryFromAPI(searchId: string): Promise<void> {
   try {
     await axios.delete(`${API_BASE_URL}/api/history/${searchId}`);
@@ -176,6 +190,18 @@ function* loadHistorySaga(action: PayloadAction<{ page?: number; pageSize?: numb
   }
 }
 
+// Worker saga: Load a single history item with a page of its results
+function* loadHistoryDetailSaga(action: PayloadAction<{ historyId: string; page?: number; pageSize?: number }>) {
+  try {
+    const { historyId, page = 1, pageSize = 100 } = action.payload;
+    const detail: HistoryDetailResponse = yield call(loadHistoryDetailFromAPI, historyId, page, pageSize);
+    yield put(loadHistoryDetailSuccess(detail));
+  } catch (error) {
+    const errorMessage = error instanceof Error ? error.message : 'Failed to load history item';
+    yield put(loadHistoryDetailFailure(errorMessage));
+  }
+}
+
 // Watcher sagas
 function* watchAddSearchToHistory() {
   yield takeEvery(addSearchToHistoryRequest.type, addSearchToHistorySaga);
@@ -193,10 +219,15 @@ function* watchLoadHistory() {
   yield takeEvery(loadHistoryRequest.type, loadHistorySaga);
 }
 
+function* watchLoadHistoryDetail() {
+  yield takeLatest(loadHistoryDetailRequest.type, loadHistoryDetailSaga);
+}
+
 // Root saga
 export default function* historySaga() {
   yield fork(watchAddSearchToHistory);
   yield fork(watchRemoveSearchFromHistory);
   yield fork(watchClearHistory);
   yield fork(watchLoadHistory);
+  yield fork(watchLoadHistoryDetail);
 }
@@ -5,3 +5,6 @@ export const selectHistoryItems = (state: RootState) => state.history.searchHist
 export const selectHistoryLoading = (state: RootState) => state.history.loading;
 export const selectHistoryError = (state: RootState) => state.history.error;
 export const selectHistoryPagination = (state: RootState) => state.history.pagination;
+export const selectHistoryDetail = (state: RootState) => state.history.detail.item;
+export const selectHistoryDetailLoading = (state: RootState) => state.history.detail.loading;
+export const selectHistoryDetailError = (state: RootState) => state.history.detail.error;
@@ -22,10 +22,23 @@ export interface SearchHistoryItem {
   query: string;
   timestamp: number;
   resultCount: number;
-  results: NasaImage[];
+  // Omitted when history is loaded in summary mode; see HistoryDetailResponse
+  results?: NasaImage[];
   confidence_scores?: { [key: number]: number };
 }
 
+export interface HistoryDetailResponse {
+  id: string;
+  query: string;
+  timestamp: number;
+  resultCount: number;
+  results: NasaImage[];
+  confidence_scores: { [key: number]: number };
+  page: number;
+  pageSize: number;
+  has_more: boolean;
+}
+
 export interface PaginatedHistoryResponse {
   items: SearchHistoryItem[];
   page: number;
@@ -34,6 +47,7 @@ export interface PaginatedHistoryResponse {
   total_pages: number;
   has_next: boolean;
   has_previous: boolean;
+  next_cursor?: string | null;
 }
 
 // API related types